@@ -2,32 +2,45 @@ from __future__ import annotations
 
 import argparse
 import json
-from dataclasses import dataclass, field, asdict
-from enum import Enum
+import os
+from dataclasses import dataclass, field
+from itertools import chain
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # orjson ist optional, ohne das Paket wird das json-Modul der Standardbibliothek genutzt
+    orjson = None
 
-class ModuleStatus(str, Enum):
-    """Interner Status eines Moduls."""
+
+class ModuleStatus:
+    """
+    Interner Status eines Moduls.
+
+    Bewusst einfache Zeichenketten statt Enum: Vergleiche im Snapshot bleiben reine
+    String-Vergleiche und die Werte können unverändert in JSON geschrieben werden.
+    """
 
     PLANNED = "planned"
     ENROLLED = "enrolled"
     COMPLETED = "completed"
     RECOGNIZED = "recognized"
 
-    def label(self) -> str:
-        """Deutschsprachige Bezeichnung für die Anzeige."""
-        mapping = {
-            ModuleStatus.PLANNED: "Geplant",
-            ModuleStatus.ENROLLED: "Eingeschrieben",
-            ModuleStatus.COMPLETED: "Abgeschlossen",
-            ModuleStatus.RECOGNIZED: "Anerkannt",
-        }
-        return mapping[self]
 
+# Deutschsprachige Bezeichnung je Status für die Anzeige
+_STATUS_LABELS = {
+    ModuleStatus.PLANNED: "Geplant",
+    ModuleStatus.ENROLLED: "Eingeschrieben",
+    ModuleStatus.COMPLETED: "Abgeschlossen",
+    ModuleStatus.RECOGNIZED: "Anerkannt",
+}
+_VALID_STATUSES = frozenset(_STATUS_LABELS)
+# Status, mit denen ein Modul als erledigt gilt (zählt für ECTS und Semesterabschluss)
+_DONE_STATUSES = frozenset({ModuleStatus.COMPLETED, ModuleStatus.RECOGNIZED})
 
-@dataclass
+
+@dataclass(slots=True)
 class Assessment:
     name: str
     max_points: float
@@ -56,14 +69,14 @@ class Assessment:
         return self.passed
 
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     id: Optional[int]  # fachliche ID des Moduls für CLI-Auswahl und Modell
     code: str
     title: str
     ects: int
     assessment: Assessment
-    status: ModuleStatus = ModuleStatus.PLANNED
+    status: str = ModuleStatus.PLANNED
 
     def enroll(self) -> None:
         # Einschreibung ohne Bewertung
@@ -84,19 +97,19 @@ class Module:
         self.status = ModuleStatus.PLANNED
 
 
-@dataclass
+@dataclass(slots=True)
 class Semester:
     semester: int
     modules: List[Module] = field(default_factory=list)
 
-    def add_module(self, module: Module) -> None:
-        self.modules.append(module)
-
     def get_module(self, code: str) -> Optional[Module]:
         return next((m for m in self.modules if m.code == code), None)
 
 
 class Goal:
+    # Leere Slots, damit die Dataclass-Unterklassen ohne __dict__ auskommen
+    __slots__ = ()
+
     description: str
 
     def is_met(self, context: "ProgramSnapshot") -> bool:
@@ -105,38 +118,59 @@ class Goal:
     def progress(self, context: "ProgramSnapshot") -> float:
         raise NotImplementedError
 
+    def evaluate(self, context: "ProgramSnapshot") -> Tuple[float, bool]:
+        """
+        Liefert Fortschritt und Erfüllung des Ziels in einem Aufruf.
+
+        Unterklassen können dies überschreiben, um beide Werte aus einer gemeinsamen
+        Berechnung abzuleiten; standardmäßig werden `progress` und `is_met` genutzt.
+        """
+        return self.progress(context), self.is_met(context)
+
 
-@dataclass
+@dataclass(slots=True)
 class DurationGoal(Goal):
     planned_semesters: int
     description: str = "Studium in geplanter Zeit abschließen"
 
     def is_met(self, context: "ProgramSnapshot") -> bool:
-        return context.completed_semesters <= self.planned_semesters
+        return self.evaluate(context)[1]
 
     def progress(self, context: "ProgramSnapshot") -> float:
-        if context.completed_semesters == 0 or self.planned_semesters == 0:
-            return 0.0
-        ratio = context.completed_semesters / self.planned_semesters
-        return max(0.0, min(1.0, ratio))
+        return self.evaluate(context)[0]
+
+    def evaluate(self, context: "ProgramSnapshot") -> Tuple[float, bool]:
+        completed = context.completed_semesters
+        met = completed <= self.planned_semesters
+        if completed == 0 or self.planned_semesters == 0:
+            return 0.0, met
+        ratio = completed / self.planned_semesters
+        return max(0.0, min(1.0, ratio)), met
 
 
-@dataclass
+@dataclass(slots=True)
 class GPAgoal(Goal):
     max_gpa: float
     description: str = "Notenschnitt halten"
 
     def is_met(self, context: "ProgramSnapshot") -> bool:
-        return context.current_gpa is not None and context.current_gpa <= self.max_gpa
+        return self.evaluate(context)[1]
 
     def progress(self, context: "ProgramSnapshot") -> float:
-        if context.current_gpa is None or context.current_gpa == 0:
-            return 0.0
-        ratio = self.max_gpa / context.current_gpa
-        return max(0.0, min(1.0, ratio))
+        return self.evaluate(context)[0]
+
+    def evaluate(self, context: "ProgramSnapshot") -> Tuple[float, bool]:
+        gpa = context.current_gpa
+        if gpa is None:
+            return 0.0, False
+        met = gpa <= self.max_gpa
+        if gpa == 0:
+            return 0.0, met
+        ratio = self.max_gpa / gpa
+        return max(0.0, min(1.0, ratio)), met
 
 
-@dataclass
+@dataclass(slots=True)
 class ProgramSnapshot:
     modules: List[Module]
     completed_modules: List[Module]
@@ -150,49 +184,143 @@ class ProgramSnapshot:
     completed_semesters: int
 
 
-@dataclass
+@dataclass(slots=True)
 class StudyProgram:
     name: str
     total_ects: int
     semesters: List[Semester] = field(default_factory=list)
     goals: List[Goal] = field(default_factory=list)
+    # Zwischengespeicherter Snapshot; wird bei jeder Änderung am Programm verworfen
+    _snapshot_cache: Optional[ProgramSnapshot] = field(default=None, init=False, repr=False, compare=False)
+    # Indizes für direkte Modulsuche per Code bzw. ID, werden bei jeder Registrierung gepflegt
+    _code_index: Dict[str, Module] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _id_index: Dict[int, Module] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _next_id: int = field(default=1, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.reindex()
 
     def add_semester(self, semester: Semester) -> None:
         self.semesters.append(semester)
+        for module in semester.modules:
+            self._index_module(module)
+        self.invalidate()
 
-    def find_module(self, code: str) -> Optional[Module]:
+    def register_module(self, semester: Semester, module: Module) -> None:
+        """
+        Fügt ein Modul einem Semester des Programms hinzu und hält die Indizes aktuell.
+
+        Sobald ein Semester per `add_semester` zum Programm gehört, ist dies der einzige
+        unterstützte Weg, Module hinzuzufügen. Direktes Anhängen an `semester.modules`
+        umgeht Code-/ID-Index, die nächste freie ID und den Snapshot-Cache.
+        Module eines neuen Semesters werden vorher über `Semester(nummer, modules=[...])` übergeben.
+        """
+        if not any(s is semester for s in self.semesters):
+            raise ValueError(f"Semester {semester.semester} gehört nicht zum Programm.")
+        semester.modules.append(module)
+        self._index_module(module)
+        self.invalidate()
+
+    def allocate_id(self) -> int:
+        """Liefert die nächste freie fachliche Modul-ID."""
+        module_id = self._next_id
+        self._next_id += 1
+        return module_id
+
+    def reindex(self) -> None:
+        """
+        Baut die Modul-Indizes vollständig neu auf.
+
+        Notwendig, wenn Module außerhalb von `register_module` verändert wurden,
+        z.B. nach dem nachträglichen Vergeben von IDs beim Laden.
+        """
+        self._code_index.clear()
+        self._id_index.clear()
+        self._next_id = 1
         for semester in self.semesters:
-            module = semester.get_module(code)
-            if module:
-                return module
-        return None
+            for module in semester.modules:
+                self._index_module(module)
+        self.invalidate()
+
+    def _index_module(self, module: Module) -> None:
+        # Doppelte Codes: wie bisher bei find_module gewinnt das zuerst gefundene Modul.
+        # Doppelte IDs: wie bisher bei der ID-Auswahl der CLI gewinnt das zuletzt gefundene Modul.
+        self._code_index.setdefault(module.code, module)
+        if module.id is not None:
+            self._id_index[module.id] = module
+            self._next_id = max(self._next_id, module.id + 1)
+
+    def invalidate(self) -> None:
+        """
+        Verwirft den zwischengespeicherten Snapshot.
+
+        Muss nach jeder Änderung an Modulen (Status, Note) aufgerufen werden, da Module ihr
+        Programm nicht kennen und den Cache nicht selbst verwerfen können.
+        `add_semester` und `register_module` verwerfen den Cache bereits selbst.
+        """
+        self._snapshot_cache = None
+
+    def find_module(self, code: str) -> Optional[Module]:
+        return self._code_index.get(code)
+
+    def find_module_by_id(self, module_id: int) -> Optional[Module]:
+        return self._id_index.get(module_id)
 
     def all_modules(self) -> List[Module]:
         return [m for semester in self.semesters for m in semester.modules]
 
     def snapshot(self) -> ProgramSnapshot:
-        modules = self.all_modules()
-        completed = [m for m in modules if m.status == ModuleStatus.COMPLETED]
-        enrolled = [m for m in modules if m.status == ModuleStatus.ENROLLED]
-        planned = [m for m in modules if m.status == ModuleStatus.PLANNED]
-        recognized = [m for m in modules if m.status == ModuleStatus.RECOGNIZED]
-
-        # Anerkannte Module zählen ebenfalls zu den abgeschlossenen ECTS
-        ects_completed = sum(m.ects for m in completed + recognized)
-        ects_enrolled = sum(m.ects for m in enrolled)
-        # GPA nur aus Modulen mit Note, damit Anerkennungen den Schnitt nicht verfälschen
-        gpa = self._calculate_gpa(completed)
-
-        # Semester gilt als abgeschlossen, wenn alle Module abgeschlossen ODER anerkannt sind
-        completed_semesters = sum(
-            1
-            for semester in self.semesters
-            if semester.modules
-            and all(
-                m.status in (ModuleStatus.COMPLETED, ModuleStatus.RECOGNIZED)
-                for m in semester.modules
-            )
-        )
+        # Zwischen zwei Änderungen ist der Snapshot unveränderlich und kann wiederverwendet werden
+        if self._snapshot_cache is None:
+            self._snapshot_cache = self._build_snapshot()
+        return self._snapshot_cache
+
+    def _build_snapshot(self) -> ProgramSnapshot:
+        # Alle Kennzahlen in einem einzigen Durchlauf über die Module ermitteln
+        modules: List[Module] = []
+        completed: List[Module] = []
+        enrolled: List[Module] = []
+        planned: List[Module] = []
+        recognized: List[Module] = []
+        buckets = {
+            ModuleStatus.COMPLETED: completed,
+            ModuleStatus.ENROLLED: enrolled,
+            ModuleStatus.PLANNED: planned,
+            ModuleStatus.RECOGNIZED: recognized,
+        }
+        ects_completed = 0
+        ects_enrolled = 0
+        weighted_sum = 0.0
+        ects_graded = 0
+        completed_semesters = 0
+
+        for semester in self.semesters:
+            # Semester gilt als abgeschlossen, wenn alle Module abgeschlossen ODER anerkannt sind
+            semester_done = bool(semester.modules)
+            for m in semester.modules:
+                # Attribute je Modul nur einmal lesen, die Schleife läuft bei jedem neuen Snapshot
+                status = m.status
+                ects = m.ects
+                modules.append(m)
+                buckets[status].append(m)
+                if status == ModuleStatus.COMPLETED:
+                    ects_completed += ects
+                    # GPA nur aus Modulen mit Note, damit Anerkennungen den Schnitt nicht verfälschen
+                    grade = m.assessment.grade
+                    if grade is not None:
+                        weighted_sum += grade * ects
+                        ects_graded += ects
+                elif status == ModuleStatus.RECOGNIZED:
+                    # Anerkannte Module zählen ebenfalls zu den abgeschlossenen ECTS
+                    ects_completed += ects
+                elif status == ModuleStatus.ENROLLED:
+                    ects_enrolled += ects
+                if status not in _DONE_STATUSES:
+                    semester_done = False
+            if semester_done:
+                completed_semesters += 1
+
+        gpa = round(weighted_sum / ects_graded, 2) if ects_graded else None
 
         return ProgramSnapshot(
             modules=modules,
@@ -207,40 +335,56 @@ class StudyProgram:
             completed_semesters=completed_semesters,
         )
 
-    @staticmethod
-    def _calculate_gpa(completed_modules: Iterable[Module]) -> Optional[float]:
-        graded = [m for m in completed_modules if m.assessment.grade is not None]
-        if not graded:
-            return None
-        weighted_sum = sum(m.assessment.grade * m.ects for m in graded)
-        ects_sum = sum(m.ects for m in graded)
-        return round(weighted_sum / ects_sum, 2) if ects_sum else None
+
+# Spaltenbreiten der Modultabellen
+_TABLE_CODE_WIDTH = 14
+_TABLE_TITLE_WIDTH = 48
+# Zeilenvorlagen und Kopfzeilen sind bei festen Spaltenbreiten konstant und werden nur einmal erzeugt
+_ROW_FORMAT = "{code:<%d} {title:<%d} {ects:>4}  {status:<12} {grade:<5}" % (_TABLE_CODE_WIDTH, _TABLE_TITLE_WIDTH)
+_ROW_FORMAT_WITH_ID = "{id:<4} " + _ROW_FORMAT
+
+
+def _table_headers(row_format: str) -> Tuple[str, str]:
+    headers = row_format.format(id="ID", code="Code", title="Titel", ects="ECTS", status="Status", grade="Note")
+    return headers, "-" * len(headers)
+
+
+_TABLE_HEADERS = _table_headers(_ROW_FORMAT)
+_TABLE_HEADERS_WITH_ID = _table_headers(_ROW_FORMAT_WITH_ID)
+
+# Vorberechnete Balkenstücke für die Standardbreite der Fortschrittsanzeige
+_PROGRESS_WIDTH = 30
+_PROGRESS_FILLED = ["#" * i for i in range(_PROGRESS_WIDTH + 1)]
+_PROGRESS_EMPTY = ["-" * i for i in range(_PROGRESS_WIDTH + 1)]
 
 
 class DashboardViewModel:
     def __init__(self, program: StudyProgram) -> None:
         self.program = program
 
-    def progress_bar(self, width: int = 30) -> str:
-        snapshot = self.program.snapshot()
+    def progress_bar(self, snapshot: ProgramSnapshot, width: int = _PROGRESS_WIDTH) -> str:
         if snapshot.total_ects == 0:
             return "[Keine Ziel-ECTS konfiguriert]"
         ratio = snapshot.ects_completed / snapshot.total_ects
         # Breite der Balkenanzeige bleibt konstant, nur der gefüllte Anteil variiert
         filled = int(ratio * width)
-        return f"[{'#' * filled}{'-' * (width - filled)}] {ratio:.0%} ({snapshot.ects_completed}/{snapshot.total_ects} ECTS)"
+        if width == _PROGRESS_WIDTH and 0 <= filled <= width:
+            bar = _PROGRESS_FILLED[filled] + _PROGRESS_EMPTY[width - filled]
+        else:
+            bar = "#" * filled + "-" * (width - filled)
+        return f"[{bar}] {ratio:.0%} ({snapshot.ects_completed}/{snapshot.total_ects} ECTS)"
 
-    def goal_descriptions(self) -> List[str]:
-        snapshot = self.program.snapshot()
+    def goal_descriptions(self, snapshot: ProgramSnapshot) -> List[str]:
         descriptions = []
         for goal in self.program.goals:
-            met = "erfüllt" if goal.is_met(snapshot) else "offen"
+            # Fortschritt und Erfüllung mit einer einzigen Auswertung pro Ziel ermitteln
+            progress, is_met = goal.evaluate(snapshot)
+            met = "erfüllt" if is_met else "offen"
             # Pro Ziel eine formatierte Zeile erzeugen, damit CLI die Liste einfach ausgeben kann
-            descriptions.append(f"{goal.description}: {goal.progress(snapshot)*100:.0f}% ({met})")
+            descriptions.append(f"{goal.description}: {progress*100:.0f}% ({met})")
         return descriptions
 
-    def bucket_counts(self) -> Dict[str, int]:
-        snapshot = self.program.snapshot()
+    def bucket_counts(self, snapshot: ProgramSnapshot) -> Dict[str, int]:
         return {
             "Abgeschlossen": len(snapshot.completed_modules),
             "Eingeschrieben": len(snapshot.enrolled_modules),
@@ -248,38 +392,48 @@ class DashboardViewModel:
             "Anerkannt": len(snapshot.recognized_modules),
         }
 
-    def grade_summary(self) -> str:
-        gpa = self.program.snapshot().current_gpa
+    def grade_summary(self, snapshot: ProgramSnapshot) -> str:
+        gpa = snapshot.current_gpa
         return f"Aktueller Notenschnitt: {gpa:.2f}" if gpa is not None else "Noch keine Noten gespeichert."
 
     def module_table(self, modules: Iterable[Module], id_map: Optional[Dict[str, int]] = None) -> str:
         """Tabellarische Darstellung mit festen Spaltenbreiten, damit ECTS/Status sauber ausgerichtet bleiben."""
-        title_width = 48
-        code_width = 14
+        row_format, headers = self._table_layout(id_map)
+        return "\n".join([*headers, *(self._format_row(row_format, module, id_map) for module in modules)])
 
-        def short(text: str, width: int) -> str:
-            return text if len(text) <= width else text[: width - 3] + "..."
+    def status_tables(self, modules: Iterable[Module], id_map: Optional[Dict[str, int]] = None) -> Dict[str, str]:
+        """
+        Erzeugt die Tabellen aller Modulstatus in einem einzigen Durchlauf über die Module.
 
+        Liefert Status -> Tabelle, die Zeilen behalten die Reihenfolge von `modules`.
+        """
+        row_format, headers = self._table_layout(id_map)
+        rows = {status: [*headers] for status in _STATUS_LABELS}
+        for module in modules:
+            rows[module.status].append(self._format_row(row_format, module, id_map))
+        return {status: "\n".join(lines) for status, lines in rows.items()}
+
+    @staticmethod
+    def _table_layout(id_map: Optional[Dict[str, int]]) -> Tuple[str, Tuple[str, str]]:
+        # Liefert die gemeinsamen Konstanten; Aufrufer kopieren die Kopfzeilen nur bei Bedarf
         if id_map:
-            headers = f"{'ID':<4} {'Code':<{code_width}} {'Titel':<{title_width}} {'ECTS':>4}  {'Status':<12} {'Note':<5}"
-        else:
-            headers = f"{'Code':<{code_width}} {'Titel':<{title_width}} {'ECTS':>4}  {'Status':<12} {'Note':<5}"
-        lines = [headers, "-" * len(headers)]
+            return _ROW_FORMAT_WITH_ID, _TABLE_HEADERS_WITH_ID
+        return _ROW_FORMAT, _TABLE_HEADERS
 
-        for module in modules:
-            grade = f"{module.assessment.grade:.1f}" if module.assessment.grade is not None else "-"
-            code = short(module.code, code_width)
-            title = short(module.title, title_width)
-            if id_map:
-                id_str = str(id_map.get(module.code, ""))
-                lines.append(
-                    f"{id_str:<4} {code:<{code_width}} {title:<{title_width}} {module.ects:>4}  {module.status.label():<12} {grade:<5}"
-                )
-            else:
-                lines.append(
-                    f"{code:<{code_width}} {title:<{title_width}} {module.ects:>4}  {module.status.label():<12} {grade:<5}"
-                )
-        return "\n".join(lines)
+    @staticmethod
+    def _format_row(row_format: str, module: Module, id_map: Optional[Dict[str, int]]) -> str:
+        return row_format.format(
+            id=str(id_map.get(module.code, "")) if id_map else "",
+            code=DashboardViewModel._short(module.code, _TABLE_CODE_WIDTH),
+            title=DashboardViewModel._short(module.title, _TABLE_TITLE_WIDTH),
+            ects=module.ects,
+            status=_STATUS_LABELS[module.status],
+            grade=f"{module.assessment.grade:.1f}" if module.assessment.grade is not None else "-",
+        )
+
+    @staticmethod
+    def _short(text: str, width: int) -> str:
+        return text if len(text) <= width else text[: width - 3] + "..."
 
 
 class PersistenceService:
@@ -299,8 +453,14 @@ class PersistenceService:
                             "code": module.code,
                             "title": module.title,
                             "ects": module.ects,
-                            "status": module.status.value,
-                            "assessment": asdict(module.assessment),
+                            "status": module.status,
+                            # Direkt aufgebaut, da asdict() jeden Wert per deepcopy kopiert
+                            "assessment": {
+                                "name": module.assessment.name,
+                                "max_points": module.assessment.max_points,
+                                "passed": module.assessment.passed,
+                                "grade": module.assessment.grade,
+                            },
                         }
                         for module in semester.modules
                     ],
@@ -308,13 +468,44 @@ class PersistenceService:
                 for semester in program.semesters
             ],
         }
+        data = PersistenceService._dumps(payload)
+        # Unveränderte Daten nicht erneut schreiben
+        if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        # Erst in eine temporäre Datei schreiben und dann ersetzen, damit ein Absturz
+        # während des Schreibens die bestehende Datendatei nicht beschädigt
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        handle = open(tmp_path, "wb")
+        try:
+            with handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            # Keine halb geschriebene temporäre Datei neben der Datendatei zurücklassen
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _dumps(payload: Dict) -> bytes:
+        # orjson liefert direkt UTF-8-Bytes und ist deutlich schneller als json.dumps mit indent
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def _loads(data: bytes) -> Dict:
+        # Beide Parser lesen UTF-8-Bytes direkt, ein vorheriges Dekodieren zu str entfällt
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
 
     @staticmethod
     def load(path: Path) -> StudyProgram:
         # Unterstützt sowohl aktuelle Dateien als auch alte Strukturen mit 'number'-Feld
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = PersistenceService._loads(path.read_bytes())
         program = StudyProgram(payload["name"], payload["total_ects"])
 
         for goal_payload in payload.get("goals", []):
@@ -324,7 +515,7 @@ class PersistenceService:
             sem_value = semester_payload.get("semester", semester_payload.get("number"))
             if sem_value is None:
                 raise KeyError("Semester-Eintrag benötigt das Feld 'semester' (oder legacy 'number').")
-            semester = Semester(sem_value)
+            modules: List[Module] = []
             for module_payload in semester_payload["modules"]:
                 assessment_data = module_payload["assessment"]
                 assessment = Assessment(
@@ -333,16 +524,20 @@ class PersistenceService:
                     passed=assessment_data.get("passed", False),
                     grade=assessment_data.get("grade"),
                 )
+                status = module_payload["status"]
+                if status not in _VALID_STATUSES:
+                    raise ValueError(f"Unbekannter Modulstatus: {status}")
                 module = Module(
                     id=module_payload.get("id"),  # Kann bei alten Dateien None sein
                     code=module_payload["code"],
                     title=module_payload["title"],
                     ects=module_payload["ects"],
-                    status=ModuleStatus(module_payload["status"]),
+                    status=status,
                     assessment=assessment,
                 )
-                semester.add_module(module)
-            program.add_semester(semester)
+                modules.append(module)
+            # Module vor add_semester vollständig übergeben, damit das Programm sie indexiert
+            program.add_semester(Semester(sem_value, modules))
 
         # Sicherstellen, dass alle Module eine eindeutige ID besitzen
         PersistenceService._ensure_module_ids(program)
@@ -354,14 +549,17 @@ class PersistenceService:
         Stellt sicher, dass alle Module eine eindeutige numerische ID besitzen.
         Für ältere Datendateien ohne ID werden IDs nachträglich vergeben.
         """
-        modules = program.all_modules()
-        used_ids = {m.id for m in modules if m.id is not None}
-        next_id = max(used_ids) + 1 if used_ids else 1
-
-        for module in modules:
-            if module.id is None:
-                module.id = next_id
-                next_id += 1
+        # Das Programm kennt die nächste freie ID bereits aus add_semester
+        assigned = False
+        for semester in program.semesters:
+            for module in semester.modules:
+                if module.id is None:
+                    module.id = program.allocate_id()
+                    assigned = True
+
+        # Neu vergebene IDs in die Indizes des Programms übernehmen
+        if assigned:
+            program.reindex()
 
     @staticmethod
     def _serialize_goal(goal: Goal) -> Dict:
@@ -428,6 +626,22 @@ class DashboardCLI:
     def __init__(self, program: StudyProgram, data_path: Path) -> None:
         self.program = program
         self.data_path = data_path
+        # Das ViewModel hält keinen Zustand pro Aufruf und wird daher für die ganze Sitzung wiederverwendet
+        self.vm = DashboardViewModel(program)
+        # Änderungen werden gesammelt und erst beim Beenden bzw. auf Wunsch geschrieben
+        self._dirty_on_disk = False
+
+    def flush(self) -> bool:
+        """
+        Schreibt ausstehende Änderungen in die Datendatei. Liefert True, wenn gespeichert wurde.
+
+        Schlägt das Schreiben fehl (OSError), bleiben die Änderungen als ungespeichert markiert.
+        """
+        if not self._dirty_on_disk:
+            return False
+        PersistenceService.save(self.program, self.data_path)
+        self._dirty_on_disk = False
+        return True
 
     def run(self) -> None:
         while True:
@@ -438,6 +652,7 @@ class DashboardCLI:
                 " [2] Modulstatus ändern\n"
                 " [3] Modul hinzufügen\n"
                 " [4] Notenübersicht\n"
+                " [5] Speichern\n"
                 " [0] Beenden\n"
                 "\nEingabe: "
             ).strip()
@@ -450,80 +665,79 @@ class DashboardCLI:
                     self._add_module()
                 elif choice == "4":
                     self._show_grades()
+                elif choice == "5":
+                    self._save()
                 elif choice == "0":
+                    try:
+                        self.flush()
+                    except OSError as exc:
+                        # Sitzung nicht beenden, damit keine Änderungen verloren gehen
+                        self._warn_save_failed(exc)
+                        continue
                     print("Bis bald!")
                     return
             except ValueError as exc:
                 print(f"Warnung: {exc}")
 
     def _print_overview(self) -> None:
-        vm = DashboardViewModel(self.program)
+        vm = self.vm
+        # Ein Snapshot pro Anzeige, den alle ViewModel-Methoden gemeinsam nutzen
+        snapshot = self.program.snapshot()
         # Kurze Zusammenfassung des Fortschritts als Einstieg für jede Interaktion
         print("\n" + "=" * 60)
         print(self.program.name)
-        print(vm.progress_bar())
-        print(vm.grade_summary())
+        print(vm.progress_bar(snapshot))
+        print(vm.grade_summary(snapshot))
 
         # Ziele
         print("\nZiele:")
-        for goal_line in vm.goal_descriptions():
+        for goal_line in vm.goal_descriptions(snapshot):
             print(f"- {goal_line}")
 
         # Modulstatus
         print("\nModulstatus:")
-        for bucket, count in vm.bucket_counts().items():
+        for bucket, count in vm.bucket_counts(snapshot).items():
             print(f"{bucket}: {count}")
 
-    def _build_indexes(self, snapshot: ProgramSnapshot) -> Tuple[Dict[int, Module], Dict[str, int]]:
+    def _build_code_index(self, snapshot: ProgramSnapshot) -> Dict[str, int]:
         """
-        Erstellt Mapping von fachlicher Modul-ID -> Modul
-        und Modulcode -> fachliche ID.
+        Erstellt Mapping von Modulcode -> fachliche ID für die Tabellenanzeige.
 
         Damit arbeitet die CLI nicht mehr mit reinen Listenpositionen, sondern mit stabilen IDs.
+        Die Suche per ID übernimmt `StudyProgram.find_module_by_id`; dass jedes Modul eine ID
+        besitzt, stellt bereits `PersistenceService._ensure_module_ids` beim Laden sicher.
         """
-        id_index: Dict[int, Module] = {}
-        code_index: Dict[str, int] = {}
-        for module in snapshot.modules:
-            if module.id is None:
-                raise ValueError(f"Modul {module.code} besitzt keine ID.")
-            id_index[module.id] = module
-            code_index[module.code] = module.id
-        return id_index, code_index
+        # Rückwärts aufgebaut, damit bei doppelten Codes wie bei `find_module` das erste Modul gewinnt
+        return {module.code: module.id for module in reversed(snapshot.modules)}
 
-    def _list_modules(self) -> None:
-        vm = DashboardViewModel(self.program)
-        snapshot = self.program.snapshot()
-        _, code_index = self._build_indexes(snapshot)
+    def _print_all_tables(self, snapshot: ProgramSnapshot, code_index: Dict[str, int]) -> None:
+        vm = self.vm
+        # Alle vier Tabellen entstehen in einem gemeinsamen Durchlauf über die Module
+        tables = vm.status_tables(snapshot.modules, id_map=code_index)
 
         print("\n--- Abgeschlossene Module ---")
-        print(vm.module_table(snapshot.completed_modules, id_map=code_index))
+        print(tables[ModuleStatus.COMPLETED])
         print("\n--- Anerkannte Module ---")
         if snapshot.recognized_modules:
-            print(vm.module_table(snapshot.recognized_modules, id_map=code_index))
+            print(tables[ModuleStatus.RECOGNIZED])
         else:
             print("Keine anerkannten Module.")
         print("\n--- Eingeschriebene Module ---")
-        print(vm.module_table(snapshot.enrolled_modules, id_map=code_index))
+        print(tables[ModuleStatus.ENROLLED])
         print("\n--- Geplante Module ---")
-        print(vm.module_table(snapshot.planned_modules, id_map=code_index))
+        print(tables[ModuleStatus.PLANNED])
+
+    def _list_modules(self) -> None:
+        snapshot = self.program.snapshot()
+        code_index = self._build_code_index(snapshot)
+        self._print_all_tables(snapshot, code_index)
 
     def _update_module(self) -> None:
-        vm = DashboardViewModel(self.program)
         snapshot = self.program.snapshot()
-        id_index, code_index = self._build_indexes(snapshot)
+        code_index = self._build_code_index(snapshot)
 
         # Übersicht mit IDs anzeigen
-        print("\n--- Abgeschlossene Module ---")
-        print(vm.module_table(snapshot.completed_modules, id_map=code_index))
-        print("\n--- Anerkannte Module ---")
-        if snapshot.recognized_modules:
-            print(vm.module_table(snapshot.recognized_modules, id_map=code_index))
-        else:
-            print("Keine anerkannten Module.")
-        print("\n--- Eingeschriebene Module ---")
-        print(vm.module_table(snapshot.enrolled_modules, id_map=code_index))
-        print("\n--- Geplante Module ---")
-        print(vm.module_table(snapshot.planned_modules, id_map=code_index))
+        self._print_all_tables(snapshot, code_index)
         print()
 
         raw = input("Modulcode ODER ID für die Aktualisierung (0 = Abbrechen): ").strip()
@@ -535,7 +749,7 @@ class DashboardCLI:
 
         if raw.isdigit():
             module_id = InputValidator.parse_int(raw, "Ungültige ID.")
-            module = id_index.get(module_id)
+            module = self.program.find_module_by_id(module_id)
             if not module:
                 raise ValueError(f"Kein Modul mit ID {module_id} gefunden.")
         else:
@@ -544,7 +758,7 @@ class DashboardCLI:
             if not module:
                 raise ValueError(f"Modul {code} nicht gefunden.")
 
-        print(f"Aktueller Status von {module.code}: {module.status.label()}")
+        print(f"Aktueller Status von {module.code}: {_STATUS_LABELS[module.status]}")
         print("Neuer Status:")
         print(" [1] Geplant")
         print(" [2] Eingeschrieben")
@@ -581,9 +795,11 @@ class DashboardCLI:
         elif target_status == ModuleStatus.RECOGNIZED:
             module.recognize()
 
-        # Nach erfolgreicher Änderung automatisch speichern
-        PersistenceService.save(self.program, self.data_path)
-        print(f"Status von {module.code} aktualisiert und gespeichert.")
+        # Modulstatus hat sich geändert, daher muss der Snapshot neu berechnet werden
+        self.program.invalidate()
+        # Gespeichert wird gesammelt beim Beenden oder über [5] Speichern
+        self._dirty_on_disk = True
+        print(f"Status von {module.code} aktualisiert.")
 
     def _add_module(self) -> None:
         raw_semester = input("Semester (Zahl, z.B. 1, 0 = Abbrechen): ").strip()
@@ -634,16 +850,30 @@ class DashboardCLI:
             raise ValueError("Maximale Punktzahl muss positiv sein.")
 
         # Neue, eindeutige Modul-ID bestimmen
-        existing_ids = {m.id for m in self.program.all_modules() if m.id is not None}
-        new_id = max(existing_ids) + 1 if existing_ids else 1
+        new_id = self.program.allocate_id()
 
         assessment = Assessment(name=assessment_name, max_points=max_points)
         module = Module(id=new_id, code=code, title=title, ects=ects, assessment=assessment)
-        semester.add_module(module)
+        self.program.register_module(semester, module)
 
-        # Nach erfolgreichem Hinzufügen automatisch speichern
-        PersistenceService.save(self.program, self.data_path)
-        print(f"Modul {code} (ID {new_id}) wurde zu Semester {semester_number} hinzugefügt und gespeichert.\n")
+        # Gespeichert wird gesammelt beim Beenden oder über [5] Speichern
+        self._dirty_on_disk = True
+        print(f"Modul {code} (ID {new_id}) wurde zu Semester {semester_number} hinzugefügt.\n")
+
+    def _save(self) -> None:
+        try:
+            saved = self.flush()
+        except OSError as exc:
+            self._warn_save_failed(exc)
+            return
+        if saved:
+            print(f"Änderungen in {self.data_path} gespeichert.")
+        else:
+            print("Keine ungespeicherten Änderungen.")
+
+    @staticmethod
+    def _warn_save_failed(exc: OSError) -> None:
+        print(f"Warnung: Speichern fehlgeschlagen ({exc}). Änderungen sind noch nicht gespeichert, bitte erneut versuchen.")
 
     def _show_grades(self) -> None:
         snapshot = self.program.snapshot()
@@ -656,14 +886,13 @@ class DashboardCLI:
             print("Noch keine benoteten oder anerkannten Module vorhanden.")
             return
 
-        vm = DashboardViewModel(self.program)
-        _, code_index = self._build_indexes(snapshot)
+        vm = self.vm
+        code_index = self._build_code_index(snapshot)
 
-        print(vm.grade_summary())
+        print(vm.grade_summary(snapshot))
         print("Notenübersicht (inkl. anerkannter Module):")
-        # Notentabelle zeigt benotete und anerkannte Module gemeinsam an
-        modules_for_overview = graded + recognized
-        print(vm.module_table(modules_for_overview, id_map=code_index))
+        # Notentabelle zeigt benotete und anerkannte Module gemeinsam an, ohne eine neue Liste anzulegen
+        print(vm.module_table(chain(graded, recognized), id_map=code_index))
 
 
 def parse_args() -> argparse.Namespace:
@@ -696,6 +925,12 @@ def main() -> None:
         cli.run()
     except KeyboardInterrupt:
         print("\nAbbruch durch Benutzer.")
+    finally:
+        # Letzter Speicherversuch, z.B. nach Abbruch mit Strg+C
+        try:
+            cli.flush()
+        except OSError as exc:
+            print(f"Warnung: Änderungen konnten nicht gespeichert werden ({exc}).")
 
 
 if __name__ == "__main__":